@@ -0,0 +1,370 @@
+"""
+Test script for the extraction pipeline helpers
+
+Run with: python test_extract_blocks.py
+
+Requires pydantic; the streaming input tests additionally need ijson and
+are skipped without it.
+"""
+
+import io
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+# similarity.grouping imports its models as lib.models.*, relative to the repo root
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import extract_blocks
+from code_block import LanguageType
+
+
+def _stream(document):
+    """Run _stream_input over a JSON document and materialize the matches"""
+    data = json.dumps(document).encode() if not isinstance(document, bytes) else document
+    repository_info, matches = extract_blocks._stream_input(io.BytesIO(data))
+    return repository_info, list(matches)
+
+
+def test_stream_input_repository_info_first():
+    """repository_info before pattern_matches (orchestrator order)"""
+    if extract_blocks.ijson is None:
+        print("⚠️  ijson not installed - skipping")
+        return
+
+    document = {
+        'repository_info': {'path': '/repo', 'total_lines': 10},
+        'pattern_matches': [{'rule_id': 'a'}, {'rule_id': 'b'}],
+    }
+    repository_info, matches = _stream(document)
+
+    assert repository_info == document['repository_info']
+    assert matches == document['pattern_matches']
+    print("✅ repository_info first")
+
+
+def test_stream_input_matches_first():
+    """Matches that precede repository_info are buffered, in order"""
+    if extract_blocks.ijson is None:
+        print("⚠️  ijson not installed - skipping")
+        return
+
+    document = b'{"pattern_matches": [{"rule_id": "a"}, {"rule_id": "b"}], "repository_info": {"path": "/repo"}}'
+    repository_info, matches = _stream(document)
+
+    assert repository_info == {'path': '/repo'}
+    assert matches == [{'rule_id': 'a'}, {'rule_id': 'b'}]
+    print("✅ matches before repository_info")
+
+
+def test_stream_input_nested_values():
+    """Nested objects, arrays and floats are rebuilt exactly"""
+    if extract_blocks.ijson is None:
+        print("⚠️  ijson not installed - skipping")
+        return
+
+    match = {
+        'rule_id': 'a',
+        'line_start': 3,
+        'score': 0.5,
+        'meta': {'vars': [{'name': 'x'}, {'name': 'y'}], 'empty': {}, 'none': None},
+        'tags': [[1, 2], []],
+    }
+    document = {
+        'repository_info': {'path': '/repo', 'languages': ['javascript'], 'git': {'branch': 'main'}},
+        'pattern_matches': [match],
+    }
+    repository_info, matches = _stream(document)
+
+    assert repository_info == document['repository_info']
+    assert matches == [match]
+    assert isinstance(matches[0]['score'], float)
+    print("✅ nested values")
+
+
+def test_stream_input_missing_keys():
+    """Missing keys raise KeyError, like the whole-document path"""
+    if extract_blocks.ijson is None:
+        print("⚠️  ijson not installed - skipping")
+        return
+
+    for document, key in [
+        ({'repository_info': {'path': '/repo'}}, 'pattern_matches'),
+        ({'pattern_matches': []}, 'repository_info'),
+    ]:
+        try:
+            _stream(document)
+        except KeyError as e:
+            assert e.args == (key,)
+        else:
+            raise AssertionError(f"expected KeyError({key!r})")
+
+    # An empty array is not missing
+    assert _stream({'repository_info': {'path': '/repo'}, 'pattern_matches': []}) == ({'path': '/repo'}, [])
+    print("✅ missing keys")
+
+
+def test_should_stream():
+    """Streaming is opt-in: env flag or a large regular file only"""
+    if extract_blocks.ijson is None:
+        print("⚠️  ijson not installed - skipping")
+        return
+
+    import tempfile
+
+    original_flag = extract_blocks.STREAM_INPUT
+    original_min = extract_blocks.STREAM_INPUT_MIN_BYTES
+    try:
+        extract_blocks.STREAM_INPUT = False
+        # No file descriptor (or a pipe): parse the whole document
+        assert not extract_blocks._should_stream(io.BytesIO(b'{}'))
+
+        with tempfile.TemporaryFile() as f:
+            f.write(b'x' * 100)
+            f.flush()
+            assert not extract_blocks._should_stream(f)
+            extract_blocks.STREAM_INPUT_MIN_BYTES = 100
+            assert extract_blocks._should_stream(f)
+
+        extract_blocks.STREAM_INPUT = True
+        assert extract_blocks._should_stream(io.BytesIO(b'{}'))
+    finally:
+        extract_blocks.STREAM_INPUT = original_flag
+        extract_blocks.STREAM_INPUT_MIN_BYTES = original_min
+    print("✅ streaming opt-in")
+
+
+def _match(i, rule_id='object-manipulation'):
+    return {
+        'rule_id': rule_id,
+        'file_path': f'src/file{i % 7}.js',
+        'line_start': i + 1,
+        'line_end': i + 2,
+        'matched_text': f'function f{i % 5}(a) {{\n  return a + {i % 3};\n}}',
+    }
+
+
+def test_pool_matches_serial():
+    """Pooled extraction returns the same blocks, in order, as serial"""
+    import multiprocessing
+
+    if multiprocessing.get_start_method() != 'fork':
+        print("⚠️  start method is not fork (pool disabled) - skipping")
+        return
+
+    matches = [_match(i) for i in range(50)]
+    matches.insert(17, {'rule_id': 'x', 'file_path': 'bad.js'})  # fails to extract
+    repository_info = {'path': '/repo'}
+
+    original_size = extract_blocks.EXTRACT_CHUNK_SIZE
+    original_min = extract_blocks.EXTRACT_POOL_MIN_CHUNKS
+    try:
+        extract_blocks.EXTRACT_CHUNK_SIZE = 4
+        extract_blocks.EXTRACT_POOL_MIN_CHUNKS = 2
+        serial = extract_blocks.extract_code_blocks(matches, repository_info, max_workers=1)
+        pooled = extract_blocks.extract_code_blocks(iter(matches), repository_info, max_workers=2)
+    finally:
+        extract_blocks.EXTRACT_CHUNK_SIZE = original_size
+        extract_blocks.EXTRACT_POOL_MIN_CHUNKS = original_min
+
+    def dump(blocks):
+        return [b.model_dump(exclude={'detected_at'}) for b in blocks]
+
+    assert len(serial) == 50
+    assert dump(pooled) == dump(serial)
+    # Hashes were computed in the workers and arrive cached
+    assert all('content_hash' in b.__dict__ for b in pooled)
+    print("✅ pooled extraction matches serial")
+
+
+def _group(method, total_lines, occurrence_count):
+    return extract_blocks.DuplicateGroup(
+        group_id=f'dg_{method}_{total_lines}',
+        pattern_id='object-manipulation',
+        member_block_ids=[f'cb_{i}' for i in range(occurrence_count)],
+        similarity_score=1.0 if method == 'exact_match' else 0.9,
+        similarity_method=method,
+        category='utility',
+        language='javascript',
+        occurrence_count=occurrence_count,
+        total_lines=total_lines,
+        affected_files=['a.js'],
+        affected_repositories=['/repo'],
+    )
+
+
+def _suggestion(complexity, impact_score):
+    return extract_blocks.ConsolidationSuggestion(
+        suggestion_id=f'cs_{complexity}_{impact_score}',
+        duplicate_group_id='dg_test',
+        strategy='local_util',
+        strategy_rationale='test',
+        impact_score=impact_score,
+        complexity=complexity,
+        migration_risk='low',
+        breaking_changes=False,
+        affected_files_count=1,
+        affected_repositories_count=1,
+        confidence=0.9,
+    )
+
+
+def test_group_metrics():
+    """Every group counter, including exact_match groups (was compared to 'exact')"""
+    groups = [
+        _group('exact_match', 10, 2),   # reduction 10 - 5 = 5
+        _group('exact_match', 9, 3),    # 9 - 3 = 6
+        _group('structural', 7, 2),     # 7 - 3 = 4
+        _group('semantic', 4, 4),       # counted in lines only; 4 - 1 = 3
+    ]
+
+    assert extract_blocks._group_metrics(groups) == {
+        'exact_duplicates': 2,
+        'structural_duplicates': 1,
+        'total_duplicated_lines': 30,
+        'potential_loc_reduction': 18,
+    }
+    assert extract_blocks._group_metrics([]) == {
+        'exact_duplicates': 0,
+        'structural_duplicates': 0,
+        'total_duplicated_lines': 0,
+        'potential_loc_reduction': 0,
+    }
+    print("✅ group metrics")
+
+
+def test_suggestion_metrics():
+    """quick_wins counts trivial suggestions; high priority is impact >= 75"""
+    suggestions = [
+        _suggestion('trivial', 80.0),
+        _suggestion('trivial', 74.9),
+        _suggestion('simple', 75.0),
+        _suggestion('complex', 10.0),
+    ]
+
+    assert extract_blocks._suggestion_metrics(suggestions) == {
+        'quick_wins': 2,
+        'high_priority_suggestions': 2,
+    }
+    assert extract_blocks._suggestion_metrics([]) == {'quick_wins': 0, 'high_priority_suggestions': 0}
+    print("✅ suggestion metrics")
+
+
+def test_language_detection():
+    """Language comes from the file extension; anything else is unknown"""
+    cases = {
+        'src/app.js': 'javascript',
+        'src/App.JSX': 'javascript',
+        'src/types.d.ts': 'typescript',
+        'lib/util.py': 'python',
+        'cmd/main.go': 'go',
+        'pkg.v2/handler.rs': 'rust',
+        'Makefile': 'unknown',
+        'config.d/Makefile': 'unknown',    # dot in a directory, not the file
+        'notes.weird': 'unknown',
+    }
+    matches = [{**_match(i), 'file_path': path} for i, path in enumerate(cases)]
+    blocks = list(extract_blocks.iter_code_blocks(matches, {'path': '/repo'}))
+
+    assert [b.language.value for b in blocks] == list(cases.values())
+    print("✅ language detection")
+
+
+def test_exact_buckets_by_language():
+    """Identical code in two languages never shares an exact bucket or group"""
+    from similarity import grouping
+
+    source = 'function f(a) {\n  return a + 1;\n}'
+    matches = [
+        {**_match(0), 'file_path': 'a.js', 'matched_text': source},
+        {**_match(1), 'file_path': 'b.js', 'matched_text': source},
+        {**_match(2), 'file_path': 'c.py', 'matched_text': source},
+        {**_match(0), 'file_path': 'a.js', 'matched_text': source},  # same location
+    ]
+    blocks, hash_groups = extract_blocks.index_blocks(
+        extract_blocks.iter_code_blocks(matches, {'path': '/repo'})
+    )
+    content_hash = blocks[0].content_hash
+
+    assert len(blocks) == 3
+    assert set(hash_groups) == {('javascript', content_hash), ('python', content_hash)}
+    assert [b.location.file_path for b in hash_groups[('javascript', content_hash)]] == ['a.js', 'b.js']
+    assert dict(grouping._group_by_exact_hash(blocks)) == dict(hash_groups)
+
+    groups = grouping.group_by_similarity(blocks, exact_groups=hash_groups)
+    assert len(groups) == 1
+    assert groups[0].language == 'javascript'
+    assert groups[0].affected_files == ['a.js', 'b.js']
+    print("✅ exact buckets by language")
+
+
+def test_group_id():
+    """Group IDs are deterministic and scoped by language"""
+    from types import SimpleNamespace
+    from similarity import grouping
+
+    js = SimpleNamespace(language=LanguageType.JAVASCRIPT, content_hash='0123456789abcdef')
+    py = SimpleNamespace(language=LanguageType.PYTHON, content_hash='0123456789abcdef')
+
+    group_id = grouping._group_id(js)
+    assert group_id == grouping._group_id(SimpleNamespace(language='javascript', content_hash='0123456789abcdef'))
+    assert group_id != grouping._group_id(py)
+    assert group_id.startswith('dg_') and len(group_id) == 15
+    int(group_id[3:], 16)
+    print("✅ group IDs")
+
+
+def test_suggest_target_location():
+    """Targets keep the group's file extension; Python modules use underscores"""
+    def target(files, strategy, category='utility'):
+        group = _group('exact_match', 10, 2).model_copy(update={'affected_files': files, 'category': category})
+        return extract_blocks._suggest_target_location(group, strategy)
+
+    assert target(['src/api/a.js'], 'local_util') == 'src/api/utils.js'
+    assert target(['src/api/a.TS'], 'local_util') == 'src/api/utils.ts'
+    assert target(['pkg/a.py'], 'local_util') == 'pkg/utils.py'
+    assert target(['a.go'], 'local_util') == 'utils.go'
+
+    assert target(['a.js'], 'shared_package', 'logger') == 'shared/logging/logger-utils.js'
+    assert target(['a.py'], 'shared_package', 'logger') == 'shared/logging/logger_utils.py'
+    assert target(['a.py'], 'shared_package', 'auth_check') == 'shared/middleware/auth_middleware.py'
+    assert target(['a.rs'], 'shared_package', 'validator') == 'shared/validation/validators.rs'
+    assert target(['a.py'], 'shared_package') == 'shared/utils/utility.py'
+
+    # Unknown or missing extensions keep the historical .js target
+    assert target(['build/Makefile'], 'local_util') == 'build/utils.js'
+    assert target(['conf.d/run'], 'shared_package', 'logger') == 'shared/logging/logger-utils.js'
+    assert target([], 'local_util') == 'utils.js'
+
+    assert target(['a.py'], 'mcp_server') == 'mcp-servers/object-manipulation-server/'
+    assert target(['a.py'], 'autonomous_agent') == 'agents/object-manipulation-agent/'
+    print("✅ target locations")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "=" * 60)
+    print("Extraction Pipeline Tests")
+    print("=" * 60)
+
+    test_stream_input_repository_info_first()
+    test_stream_input_matches_first()
+    test_stream_input_nested_values()
+    test_stream_input_missing_keys()
+    test_should_stream()
+    test_pool_matches_serial()
+    test_group_metrics()
+    test_suggestion_metrics()
+    test_language_detection()
+    test_exact_buckets_by_language()
+    test_group_id()
+    test_suggest_target_location()
+
+    print("=" * 60)
+    print("All extraction tests passed!")
+    print("=" * 60 + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,10 +8,27 @@ for similarity comparison.
 
 from datetime import datetime
 from enum import Enum
+from functools import cached_property
 from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field, computed_field, field_validator
 import hashlib
 import json
+import re
+
+
+# Compiled once at import: content_hash normalizes every block it hashes.
+# Only comments that start a line are stripped: a // or /* further into a
+# line may sit in a string, a regex literal (/"/g) or an operator (Python's
+# //), and stripping it would hash different code identically.
+_COMMENT_RE = re.compile(r'^[ \t]*(?://[^\n]*|/\*.*?\*/)', re.MULTILINE | re.DOTALL)
+_WS_RE = re.compile(r'\s+')
+
+
+def _normalize(src: str, strip_comments: bool = True) -> str:
+    """Strip leading comments, collapse whitespace and lowercase source for hashing"""
+    if strip_comments:
+        src = _COMMENT_RE.sub('', src)
+    return _WS_RE.sub(' ', src).strip().lower()
 
 
 class LanguageType(str, Enum):
@@ -27,9 +44,24 @@ class LanguageType(str, Enum):
     CSHARP = "csharp"
     PHP = "php"
     RUBY = "ruby"
+    UNKNOWN = "unknown"
     # Add more as needed
 
 
+# Languages whose comments use // and /* */ (content_hash strips them)
+_C_STYLE_COMMENT_LANGUAGES = frozenset({
+    LanguageType.JAVASCRIPT,
+    LanguageType.TYPESCRIPT,
+    LanguageType.JAVA,
+    LanguageType.GO,
+    LanguageType.RUST,
+    LanguageType.C,
+    LanguageType.CPP,
+    LanguageType.CSHARP,
+    LanguageType.PHP,
+})
+
+
 class SemanticCategory(str, Enum):
     """Semantic categorization of code blocks"""
     UTILITY = "utility"
@@ -161,15 +193,22 @@ class CodeBlock(BaseModel):
     }
 
     @computed_field
-    @property
+    @cached_property
     def content_hash(self) -> str:
         """
         Generate hash of source code for exact duplicate detection
 
-        Uses SHA-256 hash of normalized source code
+        Uses SHA-256 hash of normalized source code (whole-line // and
+        leading /* */ comments removed for C-style languages, whitespace
+        collapsed, lowercased). Computed once per instance and
+        stored in __dict__: grouping, group IDs and serialization all read
+        it, so source_code should not be mutated after the hash is first
+        used. model_copy drops the cached value (see below).
         """
-        # Normalize: remove extra whitespace, consistent formatting
-        normalized = ' '.join(self.source_code.split())
+        normalized = _normalize(
+            self.source_code,
+            strip_comments=self.language in _C_STYLE_COMMENT_LANGUAGES
+        )
         return hashlib.sha256(normalized.encode()).hexdigest()[:16]
 
     @computed_field
@@ -201,6 +240,18 @@ class CodeBlock(BaseModel):
             'tags': self.tags,
         }
 
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> 'CodeBlock':
+        """
+        Copy the block, discarding the cached content_hash
+
+        pydantic copies __dict__, which holds the cached_property value, so
+        model_copy(update={'source_code': ...}) would otherwise keep the
+        hash of the original source.
+        """
+        copied = super().model_copy(update=update, deep=deep)
+        copied.__dict__.pop('content_hash', None)
+        return copied
+
     def __hash__(self) -> int:
         """Enable use in sets and as dict keys"""
         return hash(self.block_id)
@@ -212,6 +212,74 @@ def test_computed_fields_logic():
     print("-" * 60)
 
 
+def test_content_hash_normalization():
+    """Test that content_hash ignores comments but not comment-like code"""
+    print("\nTesting content_hash normalization...")
+    print("-" * 60)
+
+    try:
+        from code_block import CodeBlock
+    except ImportError:
+        print("⚠️  pydantic not installed - skipping")
+        print("-" * 60)
+        return
+
+    def make_block(source_code, language='javascript'):
+        return CodeBlock(
+            block_id='cb_test',
+            pattern_id='object-manipulation',
+            location={'file_path': 'file.js', 'line_start': 1, 'line_end': 1},
+            relative_path='file.js',
+            source_code=source_code,
+            language=language,
+            category='utility',
+            repository_path='/test',
+            line_count=1,
+        )
+
+    def content_hash(source_code, language='javascript'):
+        return make_block(source_code, language).content_hash
+
+    different = [
+        ("fetch('https://api.stripe.com/v1/charges', opts)",
+         "fetch('https://api.github.com/repos', opts)"),
+        ('fetch("https://a.example/x")', 'fetch("https://b.example/x")'),
+        ('const url = `https://${host}/a`;', 'const url = `https://${host}/b`;'),
+        ("glob('src/**/*.js')", "glob('src/**/*.ts')"),
+        ("const s = 'it\\'s // here';", "const s = 'it\\'s // there';"),
+        # Quote inside a regex literal must not pair with the URL's quotes
+        ('s.replace(/"/g, "&quot;"); const url = "https://api.stripe.com/v1";',
+         's.replace(/"/g, "&quot;"); const url = "https://api.github.com/repos";'),
+        # // is floor division in Python, not a comment
+        ('half = total // 2', 'half = total // 3', 'python'),
+    ]
+    same = [
+        ('// add\nreturn a + b;', 'return a + b;'),
+        ('  /* sum\n     of both */\nreturn a + b;', 'return a + b;'),
+        ('/* sum */ return a + b;', 'return a + b;'),
+        ('return   a\n  + b;', 'return a + b;'),
+    ]
+
+    for code1, code2, *language in different:
+        language = language[0] if language else 'javascript'
+        assert content_hash(code1, language) != content_hash(code2, language), (code1, code2)
+        print(f"  ✓ differ: {code1!r}")
+    for code1, code2 in same:
+        assert content_hash(code1) == content_hash(code2), (code1, code2)
+        print(f"  ✓ same:   {code1!r}")
+
+    # The hash is cached per instance; copies must not inherit a stale one
+    block = make_block('return a + b;')
+    original_hash = block.content_hash
+    copied = block.model_copy(update={'source_code': 'return a - b;'})
+    assert copied.content_hash == content_hash('return a - b;') != original_hash
+    assert block.model_copy().content_hash == original_hash
+    print("  ✓ model_copy(update=...) recomputes content_hash")
+
+    print("✅ content_hash normalization")
+    print("-" * 60)
+
+
 def main():
     """Run all tests"""
     print("\n" + "=" * 60)
@@ -221,6 +289,7 @@ def main():
     test_model_structure()
     test_sample_data()
     test_computed_fields_logic()
+    test_content_hash_normalization()
 
     print("\n" + "=" * 60)
     print("All structure tests completed!")
@@ -139,6 +139,9 @@ export class ScanOrchestrator {
       proc.stdin.write(jsonData);
       proc.stdin.end();
 
+      // Decode as UTF-8 stream so multi-byte characters split across chunks survive
+      proc.stdout.setEncoding('utf8');
+
       proc.stdout.on('data', (data) => {
         stdout += data.toString();
       });
@@ -4,9 +4,13 @@ Similarity calculation modules for duplicate detection
 
 from .structural import calculate_structural_similarity, normalize_code
 from .grouping import group_by_similarity
+from .minhash import MinHashLSH, compute_minhash, shingle_code
 
 __all__ = [
     'calculate_structural_similarity',
     'normalize_code',
     'group_by_similarity',
+    'MinHashLSH',
+    'compute_minhash',
+    'shingle_code',
 ]
@@ -0,0 +1,142 @@
+"""
+MinHash + LSH Candidate Generation
+
+Priority 2: Structural Similarity (scaling)
+Estimates Jaccard similarity of code blocks from token shingles and indexes
+the MinHash signatures with banded LSH, so near-duplicate candidates are
+found in near-linear time instead of comparing every pair of blocks.
+"""
+
+import re
+import random
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+# Universal hashing h(x) = (a*x + b) mod p, truncated to 32 bits
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Identifiers/numbers as one token, every other non-space char as its own token
+_TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+
+
+def shingle_code(normalized_code: str, size: int = 2) -> Set[str]:
+    """
+    Split normalized code into a set of token n-grams (shingles).
+
+    Blocks shorter than `size` tokens become a single shingle.
+    """
+    tokens = _TOKEN_RE.findall(normalized_code)
+    if len(tokens) <= size:
+        return {' '.join(tokens)} if tokens else set()
+
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+@lru_cache(maxsize=None)
+def _permutations(num_perm: int, seed: int) -> Tuple[Tuple[int, int], ...]:
+    """Deterministic (a, b) coefficients for the MinHash permutations"""
+    rng = random.Random(seed)
+    return tuple(
+        (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+        for _ in range(num_perm)
+    )
+
+
+def compute_minhash(shingles: Iterable[str], num_perm: int = 128, seed: int = 1) -> Tuple[int, ...]:
+    """
+    Compute the MinHash signature of a shingle set.
+
+    Each shingle is hashed once (CRC32), then every permutation takes the
+    minimum permuted value over all shingles.
+    """
+    hashes = [zlib.crc32(s.encode()) for s in shingles]
+    if not hashes:
+        return (_MAX_HASH,) * num_perm
+
+    prime = _MERSENNE_PRIME
+    mask = _MAX_HASH
+    return tuple(
+        min([((a * h + b) % prime) & mask for h in hashes])
+        for a, b in _permutations(num_perm, seed)
+    )
+
+
+def _integrate(f, a: float, b: float, steps: int = 100) -> float:
+    """Midpoint-rule integral of f over [a, b]"""
+    if b <= a:
+        return 0.0
+    width = (b - a) / steps
+    return sum(f(a + (i + 0.5) * width) for i in range(steps)) * width
+
+
+@lru_cache(maxsize=None)
+def optimal_lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) minimizing false positive + false negative probability mass.
+
+    Same criterion as datasketch's MinHashLSH: a pair with Jaccard s
+    collides in at least one band with probability 1 - (1 - s^rows)^bands.
+    """
+    best = (1, num_perm)
+    best_error = float('inf')
+
+    for bands in range(1, num_perm + 1):
+        max_rows = num_perm // bands
+        for rows in range(1, max_rows + 1):
+            def collide(s, b=bands, r=rows):
+                return 1 - (1 - s ** r) ** b
+
+            false_positive = _integrate(collide, 0.0, threshold)
+            false_negative = _integrate(lambda s: 1 - collide(s), threshold, 1.0)
+            error = 0.5 * false_positive + 0.5 * false_negative
+
+            if error < best_error:
+                best_error = error
+                best = (bands, rows)
+
+    return best
+
+
+class MinHashLSH:
+    """
+    Banded LSH index over MinHash signatures
+
+    Signatures are split into `bands` slices of `rows` values; keys whose
+    signatures agree on any full slice are returned as candidates.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128):
+        if not 0.0 < threshold < 1.0:
+            raise ValueError('threshold must be between 0 and 1 (exclusive)')
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = optimal_lsh_params(threshold, num_perm)
+        self._tables: List[Dict[Tuple[int, ...], List[Hashable]]] = [
+            defaultdict(list) for _ in range(self.bands)
+        ]
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> Iterable[Tuple[int, ...]]:
+        rows = self.rows
+        return (signature[i * rows:(i + 1) * rows] for i in range(self.bands))
+
+    def insert(self, key: Hashable, signature: Tuple[int, ...]) -> None:
+        """Add a signature to the index under `key`"""
+        if len(signature) != self.num_perm:
+            raise ValueError(f'Expected signature of length {self.num_perm}, got {len(signature)}')
+
+        for table, band in zip(self._tables, self._band_keys(signature)):
+            table[band].append(key)
+
+    def query(self, signature: Tuple[int, ...]) -> Set[Hashable]:
+        """Return keys sharing at least one band with `signature`"""
+        candidates = set()
+        for table, band in zip(self._tables, self._band_keys(signature)):
+            bucket = table.get(band)
+            if bucket:
+                candidates.update(bucket)
+        return candidates
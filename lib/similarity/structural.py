@@ -11,6 +11,20 @@ from typing import Tuple
 from difflib import SequenceMatcher
 
 
+# Normalization patterns, compiled once at import (normalize_code runs per block)
+_SINGLE_LINE_COMMENT_RE = re.compile(r'//.*?$', re.MULTILINE)
+_MULTI_LINE_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_WHITESPACE_RE = re.compile(r'\s+')
+_SINGLE_QUOTED_RE = re.compile(r"'[^']*'")
+_DOUBLE_QUOTED_RE = re.compile(r'"[^"]*"')
+_TEMPLATE_LITERAL_RE = re.compile(r'`[^`]*`')
+_NUMBER_RE = re.compile(r'\b\d+\b')
+_IDENTIFIER_RE = re.compile(r'\b[a-z][a-zA-Z0-9_]*\b')
+_CONSTANT_RE = re.compile(r'\b[A-Z][A-Z0-9_]*\b')
+_PUNCTUATION_RE = re.compile(r'\s*([(){}[\];,.])\s*')
+_OPERATOR_RE = re.compile(r'\s*(=>|===?|!==?|[+\-*/%<>=&|])\s*')
+
+
 def normalize_code(source_code: str) -> str:
     """
     Normalize code by removing variable-specific information.
@@ -22,32 +36,32 @@ def normalize_code(source_code: str) -> str:
         return ""
 
     # Remove comments
-    normalized = re.sub(r'//.*?$', '', source_code, flags=re.MULTILINE)  # Single-line comments
-    normalized = re.sub(r'/\*.*?\*/', '', normalized, flags=re.DOTALL)   # Multi-line comments
+    normalized = _SINGLE_LINE_COMMENT_RE.sub('', source_code)  # Single-line comments
+    normalized = _MULTI_LINE_COMMENT_RE.sub('', normalized)     # Multi-line comments
 
     # Normalize whitespace (collapse to single spaces)
-    normalized = re.sub(r'\s+', ' ', normalized)
+    normalized = _WHITESPACE_RE.sub(' ', normalized)
 
     # Normalize string literals (replace with placeholder)
-    normalized = re.sub(r"'[^']*'", "'STR'", normalized)
-    normalized = re.sub(r'"[^"]*"', '"STR"', normalized)
-    normalized = re.sub(r'`[^`]*`', '`STR`', normalized)
+    normalized = _SINGLE_QUOTED_RE.sub("'STR'", normalized)
+    normalized = _DOUBLE_QUOTED_RE.sub('"STR"', normalized)
+    normalized = _TEMPLATE_LITERAL_RE.sub('`STR`', normalized)
 
     # Normalize numbers (replace with placeholder)
-    normalized = re.sub(r'\b\d+\b', 'NUM', normalized)
+    normalized = _NUMBER_RE.sub('NUM', normalized)
 
     # Normalize variable names to generic form
     # Replace identifiers with placeholders while preserving structure
     # This is a simplified version - full AST comparison would be better
-    normalized = re.sub(r'\b[a-z][a-zA-Z0-9_]*\b', 'var', normalized)
-    normalized = re.sub(r'\b[A-Z][A-Z0-9_]*\b', 'CONST', normalized)
+    normalized = _IDENTIFIER_RE.sub('var', normalized)
+    normalized = _CONSTANT_RE.sub('CONST', normalized)
 
     # Remove extra spaces around operators and punctuation
-    normalized = re.sub(r'\s*([(){}[\];,.])\s*', r'\1', normalized)
-    normalized = re.sub(r'\s*(=>|===?|!==?|[+\-*/%<>=&|])\s*', r' \1 ', normalized)
+    normalized = _PUNCTUATION_RE.sub(r'\1', normalized)
+    normalized = _OPERATOR_RE.sub(r' \1 ', normalized)
 
     # Collapse multiple spaces
-    normalized = re.sub(r'\s+', ' ', normalized)
+    normalized = _WHITESPACE_RE.sub(' ', normalized)
 
     # Trim
     normalized = normalized.strip()
@@ -0,0 +1,182 @@
+"""
+Test script for MinHash + LSH candidate generation
+
+Run with: python test_minhash.py
+
+Pure stdlib - does not require pydantic.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from similarity.minhash import MinHashLSH, compute_minhash, optimal_lsh_params, shingle_code, _MAX_HASH
+from similarity.structural import calculate_structural_similarity, normalize_code
+import similarity.grouping as grouping
+from similarity.grouping import (
+    EXHAUSTIVE_MAX_BLOCKS, LSH_CANDIDATE_THRESHOLD, _find_exhaustive_candidates, _find_lsh_candidates
+)
+
+
+# Near-duplicate families plus unrelated snippets
+SNIPPETS = [
+    "function add(a, b) { return a + b; }",
+    "function sum(x, y) { return x + y; }",
+    "function sum(x, y) { const r = x + y; return r; }",
+    "const data = JSON.stringify(payload, null, 2);",
+    "const body = JSON.stringify(result, null, 4);",
+    "const body = JSON.stringify(result);",
+    "if (!user) { return res.status(401).json({ error: 'Unauthorized' }); }",
+    "if (!session) { return res.status(403).json({ error: 'Forbidden' }); }",
+    "if (!token) { res.status(401).json({ error: 'Missing token' }); return; }",
+    "items.filter(item => item.active).map(item => item.id)",
+    "users.filter(u => u.enabled).map(u => u.email)",
+    "await db.user.findMany({ where: { active: true }, take: 10 })",
+    "console.log(`Processed ${count} records`);",
+    "logger.info('Processed records', { count });",
+    "for (let i = 0; i < rows.length; i++) { total += rows[i].amount; }",
+    "throw new Error('Not implemented');",
+]
+
+
+def test_shingle_code():
+    """Token bigrams; short input becomes a single shingle"""
+    assert shingle_code('var = var') == {'var =', '= var'}
+    assert shingle_code('var') == {'var'}
+    assert shingle_code('') == set()
+    assert shingle_code('a b c', size=3) == {'a b c'}
+    print("✅ shingle_code")
+
+
+def test_signatures_deterministic():
+    """Signatures depend only on the shingle set, not order or call"""
+    shingles = shingle_code(normalize_code(SNIPPETS[0]))
+    signature = compute_minhash(shingles)
+
+    assert len(signature) == 128
+    assert signature == compute_minhash(shingles)
+    assert signature == compute_minhash(sorted(shingles, reverse=True))
+    assert signature != compute_minhash(shingles, seed=2)
+    assert len(compute_minhash(shingles, num_perm=64)) == 64
+    assert compute_minhash(set(), num_perm=4) == (_MAX_HASH,) * 4
+    assert all(0 <= value <= _MAX_HASH for value in signature)
+    print("✅ deterministic signatures")
+
+
+def test_optimal_lsh_params():
+    """Bands x rows fit the signature; stricter thresholds use more rows per band"""
+    previous_rows = 0
+    for threshold in (0.1, 0.25, 0.5, 0.75, 0.9):
+        bands, rows = optimal_lsh_params(threshold, 128)
+        assert bands >= 1 and rows >= 1
+        assert bands * rows <= 128
+        assert rows >= previous_rows
+        previous_rows = rows
+
+    assert optimal_lsh_params(LSH_CANDIDATE_THRESHOLD, 128) == (42, 3)
+    print("✅ optimal_lsh_params")
+
+
+def test_insert_query():
+    """Identical signatures always collide; disjoint shingle sets do not"""
+    lsh = MinHashLSH(threshold=0.5, num_perm=128)
+    sig_a = compute_minhash({f'a{i}' for i in range(20)})
+    sig_b = compute_minhash({f'b{i}' for i in range(20)})
+
+    lsh.insert('a', sig_a)
+    lsh.insert('a_copy', sig_a)
+    lsh.insert('b', sig_b)
+
+    assert lsh.query(sig_a) == {'a', 'a_copy'}
+    assert lsh.query(sig_b) == {'b'}
+    assert lsh.query(compute_minhash({'unseen'})) == set()
+
+    for bad in (lambda: lsh.insert('short', sig_a[:10]),
+                lambda: MinHashLSH(threshold=0.0),
+                lambda: MinHashLSH(threshold=1.0)):
+        try:
+            bad()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError")
+    print("✅ insert/query")
+
+
+def test_candidate_recall():
+    """
+    Smoke check: LSH keeps the structural pairs of a small fixture
+
+    Recall at scale is not guaranteed (see LSH_CANDIDATE_THRESHOLD); this
+    only catches gross regressions in shingling, hashing or banding.
+    """
+    blocks = [SimpleNamespace(source_code=src, language='javascript') for src in SNIPPETS]
+    blocks.append(SimpleNamespace(source_code=SNIPPETS[0], language='python'))
+
+    candidates = _find_lsh_candidates(blocks)
+    candidate_pairs = {(i, j) for i, js in enumerate(candidates) for j in js}
+
+    expected = {
+        (i, j)
+        for i in range(len(blocks))
+        for j in range(i + 1, len(blocks))
+        if blocks[i].language == blocks[j].language
+        and calculate_structural_similarity(blocks[i].source_code, blocks[j].source_code)[0] >= 0.85
+    }
+
+    assert expected, "fixture should contain structural duplicates"
+    assert expected <= candidate_pairs, f"missed pairs: {sorted(expected - candidate_pairs)}"
+    # Never pairs across languages, even for identical code
+    assert (0, len(blocks) - 1) not in candidate_pairs
+    assert all(j > i for i, j in candidate_pairs)
+    print(f"✅ candidate recall ({len(expected)} pairs, {len(candidate_pairs)} candidates)")
+
+
+def test_exhaustive_fallback():
+    """Small Layer 2 inputs compare every same-language pair, never via LSH"""
+    blocks = [SimpleNamespace(source_code=src, language='javascript') for src in SNIPPETS]
+    blocks.append(SimpleNamespace(source_code=SNIPPETS[0], language='python'))
+    assert len(blocks) <= EXHAUSTIVE_MAX_BLOCKS
+
+    candidates = _find_exhaustive_candidates(blocks)
+    last = len(blocks) - 1
+    assert candidates[0] == list(range(1, last))
+    assert candidates[last] == []
+    assert all(last not in js for js in candidates)
+
+    def no_lsh(_blocks):
+        raise AssertionError("LSH used below EXHAUSTIVE_MAX_BLOCKS")
+
+    original = grouping._find_lsh_candidates
+    grouping._find_lsh_candidates = no_lsh
+    try:
+        groups = grouping._group_by_structural_similarity(blocks, 0.85)
+    finally:
+        grouping._find_lsh_candidates = original
+
+    assert groups and all(len(members) >= 2 for members, _ in groups)
+    print(f"✅ exhaustive fallback ({len(groups)} groups)")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "=" * 60)
+    print("MinHash + LSH Tests")
+    print("=" * 60)
+
+    test_shingle_code()
+    test_signatures_deterministic()
+    test_optimal_lsh_params()
+    test_insert_query()
+    test_candidate_recall()
+    test_exhaustive_fallback()
+
+    print("=" * 60)
+    print("All MinHash tests passed!")
+    print("=" * 60 + "\n")
+
+
+if __name__ == '__main__':
+    main()